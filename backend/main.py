@@ -1,20 +1,40 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Optional, List
 import os
+import hashlib
 from dotenv import load_dotenv
-import requests
-from bs4 import BeautifulSoup
+import httpx
+import cachetools
+import ahocorasick
+from bs4 import BeautifulSoup, SoupStrainer
 import openai
 import json
+import logging
+import logging.handlers
+import queue
+import re
 import time
-from urllib.parse import urljoin, urlparse
-import pymysql
+import asyncio
+from collections import defaultdict, deque
+from itertools import islice
+from urllib.parse import urljoin, urlsplit
+import aiomysql
+import numpy as np
 
 load_dotenv()
 
+# Log records go onto an in-process queue and a listener thread does the
+# actual stream I/O, so a slow or blocking stdout never stalls the event loop
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(_log_queue)])
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title="Chatbot API", version="1.0.0")
 
 # CORS middleware
@@ -26,8 +46,132 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize OpenAI
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# Shared HTTP client for scraping (keep-alive reuse avoids a TCP+TLS handshake per URL)
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+HTTP_CLIENT = httpx.AsyncClient(
+    limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+    timeout=30,
+    http2=True,
+    headers=DEFAULT_HEADERS,
+    follow_redirects=True
+)
+
+@app.on_event("shutdown")
+async def close_http_client():
+    """Close the shared HTTP client on shutdown"""
+    await HTTP_CLIENT.aclose()
+
+# Initialize OpenAI (async client, reusing the shared HTTP client)
+OPENAI = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=HTTP_CLIENT)
+
+# Environment-driven config, read once at import (after load_dotenv) so every
+# request and the startup hooks see the same values
+WEBSITE_URL = os.getenv("WEBSITE_URL", "https://www.anonivate.com/")
+
+MYSQL_CFG = dict(
+    host=os.getenv("MYSQL_HOST", "localhost"),
+    user=os.getenv("MYSQL_USER", "root"),
+    password=os.getenv("MYSQL_PASSWORD", ""),
+    db=os.getenv("MYSQL_DB", "chatbot_db"),
+    minsize=int(os.getenv("MYSQL_POOL_MIN", "5")),
+    maxsize=int(os.getenv("MYSQL_POOL_MAX", "50")),
+    autocommit=True,
+)
+
+# MySQL logging
+INSERT_SQL ="INSERT INTO user_messages (username, ip_address, email, user_message, ai_response) VALUES (%s, %s, %s, %s, %s)"
+
+@app.on_event("startup")
+async def create_mysql_pool():
+    """Create a shared MySQL connection pool once at startup"""
+    try:
+        app.state.mysql = await aiomysql.create_pool(**MYSQL_CFG)
+    except Exception:
+        logger.exception("DB pool init error")
+        app.state.mysql = None
+
+# Chat rows are buffered on a queue and flushed by a background task as one
+# batched INSERT, keeping DB latency off the request path and amortizing
+# commit overhead across rows
+_BATCH_MAX_ROWS = 500
+_BATCH_WAIT_SECONDS = 0.2
+
+chat_log_queue = None
+_log_writer_task = None
+
+# During a DB outage every batch fails; log the first failure and then every
+# Nth so the log stream doesn't become its own incident
+_db_insert_failures = 0
+_DB_FAILURE_LOG_EVERY = 100
+
+async def _write_rows(rows):
+    """Insert a batch of chat rows with one executemany round trip"""
+    global _db_insert_failures
+    if not app.state.mysql:
+        return
+    try:
+        async with app.state.mysql.acquire() as conn:
+            async with conn.cursor() as cur:
+                await cur.executemany(INSERT_SQL, rows)
+    except Exception:
+        _db_insert_failures += 1
+        if _db_insert_failures % _DB_FAILURE_LOG_EVERY == 1:
+            logger.exception("DB insert error (%d failures so far)", _db_insert_failures)
+
+async def _drain_log_queue():
+    """Flush queued chat rows in batches of up to _BATCH_MAX_ROWS"""
+    while True:
+        rows = [await chat_log_queue.get()]
+        try:
+            while len(rows) < _BATCH_MAX_ROWS:
+                rows.append(await asyncio.wait_for(chat_log_queue.get(), timeout=_BATCH_WAIT_SECONDS))
+        except asyncio.TimeoutError:
+            pass
+        await _write_rows(rows)
+
+@app.on_event("startup")
+async def start_log_writer():
+    global chat_log_queue, _log_writer_task
+    chat_log_queue = asyncio.Queue()
+    _log_writer_task = asyncio.create_task(_drain_log_queue())
+
+@app.on_event("shutdown")
+async def stop_log_writer():
+    """Stop the writer task and flush anything still queued"""
+    if _log_writer_task:
+        _log_writer_task.cancel()
+    if chat_log_queue:
+        rows = []
+        while not chat_log_queue.empty():
+            rows.append(chat_log_queue.get_nowait())
+        if rows:
+            await _write_rows(rows)
+
+@app.on_event("shutdown")
+async def close_mysql_pool():
+    """Close the MySQL connection pool on shutdown"""
+    if app.state.mysql:
+        app.state.mysql.close()
+        await app.state.mysql.wait_closed()
+
+async def log_message(username: str, ip_address: str, email: str, user_message: str, ai_response: str):
+    """Queue a chat exchange for the batched MySQL writer"""
+    if chat_log_queue is None:
+        return
+    await chat_log_queue.put((username, ip_address, email, user_message, ai_response))
+
+async def _persist_chat(request, chat_message, ai_response: str):
+    """Log one chat exchange, deriving the client IP from the request"""
+    ip_address = request.client.host if request and request.client else "unknown"
+    await log_message(chat_message.user_name, ip_address, chat_message.user_email, chat_message.message, ai_response)
 
 # FAQ data
 faq_data = {
@@ -37,54 +181,172 @@ faq_data = {
     "What technologies are used?": "This chatbot uses React for the frontend, FastAPI for the backend, and OpenAI's GPT model for responses."
 }
 
+# FAQ lookup: each question is tokenized once at import into a word -> FAQ
+# index so matching costs a few dict lookups per request instead of a
+# substring scan over every question. Filler words are dropped and a
+# candidate only wins when most of its distinctive words appear in the
+# message, so a single shared word can't hijack an unrelated question.
+_FAQ_WORD_RE = re.compile(r"[a-z0-9']+")
+_FAQ_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "can", "do", "does", "how", "is", "it",
+    "of", "the", "this", "to", "used", "what",
+})
+
+faq_answers = list(faq_data.values())
+
+def _build_faq_index():
+    index = defaultdict(set)
+    keywords = []
+    for pos, question in enumerate(faq_data):
+        words = set(_FAQ_WORD_RE.findall(question.lower())) - _FAQ_STOPWORDS
+        keywords.append(words)
+        for word in words:
+            index[word].add(pos)
+    return dict(index), keywords
+
+faq_index, _faq_keywords = _build_faq_index()
+
+def match_faq(message_lc: str):
+    """Return the FAQ answer for an already-lowercased message, or None"""
+    tokens = set(_FAQ_WORD_RE.findall(message_lc))
+    candidates = set()
+    for token in tokens:
+        candidates.update(faq_index.get(token, ()))
+    content_tokens = tokens - _FAQ_STOPWORDS
+    best_pos = None
+    best_overlap = 0.0
+    for pos in candidates:
+        keywords = _faq_keywords[pos]
+        # Skip messages that go well beyond the FAQ's own wording - they
+        # deserve a real answer, not the canned one
+        if len(content_tokens - keywords) > 2:
+            continue
+        overlap = len(keywords & tokens) / len(keywords)
+        if overlap > best_overlap:
+            best_pos, best_overlap = pos, overlap
+    if best_overlap >= 0.75:
+        return faq_answers[best_pos]
+    return None
+
 # Conversation Memory System
-conversation_memory = {}  # Store conversation history by session_id
+# Each session holds a bounded deque; old messages are evicted in O(1).
+# Sessions idle for an hour expire from the TTL caches, so memory stays
+# bounded regardless of how many one-off visitors come through.
+_SESSION_TTL_SECONDS = 3600
+_MAX_SESSIONS = 1000
+
+conversation_memory = cachetools.TTLCache(maxsize=_MAX_SESSIONS, ttl=_SESSION_TTL_SECONDS)
+
+# Rolling summaries of turns that aged out of the verbatim window
+memory_summaries = cachetools.TTLCache(maxsize=_MAX_SESSIONS, ttl=_SESSION_TTL_SECONDS)
+
+# Rendered memory context per session, invalidated when a message is added;
+# avoids re-joining the same history on every request
+_rendered_summaries = cachetools.TTLCache(maxsize=_MAX_SESSIONS, ttl=_SESSION_TTL_SECONDS)
+
+# Rough budget (at ~4 chars/token) before old turns get summarized instead
+# of being replayed verbatim into every prompt
+_MEMORY_TOKEN_BUDGET = 800
+_VERBATIM_TURNS = 3
+_MAX_SUMMARY_CHARS = 1200
+
+# Salient bits worth keeping from a summarized turn: names and numbers
+_FACT_RE = re.compile(r'[A-Z][a-zA-Z]+|\d+')
+
+def _estimate_tokens(text: str) -> int:
+    """Cheap token estimate: ~4 characters per token"""
+    return len(text) // 4
+
+def _summarize_turn(msg: dict) -> str:
+    """Boil a turn down to the user's first sentence plus salient facts"""
+    topic = msg['user'].split('.')[0][:100]
+    facts = list(dict.fromkeys(_FACT_RE.findall(msg['assistant'])))[:10]
+    if facts:
+        return f"- {topic} ({' '.join(facts)})"
+    return f"- {topic}"
 
 def get_conversation_context(session_id: str, max_messages: int = 10) -> str:
     """Get conversation context for memory"""
-    if session_id not in conversation_memory:
+    # Get last few messages for context without materializing the deque
+    dq = conversation_memory.get(session_id)
+    if not dq:
         return ""
-    
-    # Get last few messages for context
-    recent_messages = conversation_memory[session_id][-max_messages:]
-    context = "\n".join([f"User: {msg['user']}\nAssistant: {msg['assistant']}" for msg in recent_messages])
+    recent_messages = islice(dq, max(0, len(dq) - max_messages), len(dq))
+    context = "\n".join(f"User: {msg['user']}\nAssistant: {msg['assistant']}" for msg in recent_messages)
     return context
 
 def add_to_memory(session_id: str, user_message: str, assistant_response: str):
     """Add conversation to memory"""
-    if session_id not in conversation_memory:
-        conversation_memory[session_id] = []
-    
-    conversation_memory[session_id].append({
+    # The rendered context for this session is stale now
+    _rendered_summaries.pop(session_id, None)
+
+    # maxlen=20 keeps only the last 20 messages to prevent memory overflow
+    dq = conversation_memory.get(session_id)
+    if dq is None:
+        dq = deque(maxlen=20)
+    dq.append({
         'user': user_message,
         'assistant': assistant_response,
         'timestamp': time.time()
     })
-    
-    # Keep only last 20 messages to prevent memory overflow
-    if len(conversation_memory[session_id]) > 20:
-        conversation_memory[session_id] = conversation_memory[session_id][-20:]
+    # Re-inserting refreshes the TTL, so active sessions never expire mid-chat
+    conversation_memory[session_id] = dq
+
+    # Once the verbatim history gets token-heavy, fold the oldest half into
+    # the rolling summary so prompts stay bounded instead of growing O(n)
+    total_tokens = sum(_estimate_tokens(m['user']) + _estimate_tokens(m['assistant']) for m in dq)
+    if total_tokens > _MEMORY_TOKEN_BUDGET and len(dq) > _VERBATIM_TURNS:
+        old_count = max(1, len(dq) // 2)
+        lines = [_summarize_turn(dq.popleft()) for _ in range(old_count)]
+        previous = memory_summaries.get(session_id, "")
+        combined = (previous + "\n" if previous else "") + "\n".join(lines)
+        memory_summaries[session_id] = combined[-_MAX_SUMMARY_CHARS:]
 
 def create_memory_summary(session_id: str) -> str:
     """Create a summary of conversation context for AI"""
-    if session_id not in conversation_memory or len(conversation_memory[session_id]) == 0:
-        return ""
-    
-    # Get conversation context
-    context = get_conversation_context(session_id, 5)
-    
-    if not context:
-        return ""
-    
-    # Create a brief summary
-    summary = f"Previous conversation context:\n{context}\n\nUse this context to provide more relevant and contextual responses."
-    return summary
+    cached = _rendered_summaries.get(session_id)
+    if cached is not None:
+        return cached
+
+    # Rolling summary of older turns plus the last few verbatim ones
+    summary_text = memory_summaries.get(session_id, "")
+    context = get_conversation_context(session_id, _VERBATIM_TURNS)
+
+    if not context and not summary_text:
+        rendered = ""
+    else:
+        parts = ["Previous conversation context:"]
+        if summary_text:
+            parts.append(f"Earlier in the conversation:\n{summary_text}")
+        if context:
+            parts.append(context)
+        parts.append("Use this context to provide more relevant and contextual responses.")
+        rendered = "\n\n".join(parts)
+
+    _rendered_summaries[session_id] = rendered
+    return rendered
+
+# Compiled once; convert_markdown_to_html runs on every chat response.
+# Bold and emphasis share one alternation so inline markup is rewritten in a
+# single pass over each line instead of two sequential substitutions.
+_INLINE_MD_RE = re.compile(r'\*\*(.*?)\*\*|\*(.*?)\*')
+
+def _inline_md_repl(match):
+    bold, em = match.groups()
+    if bold is not None:
+        return f'<strong>{bold}</strong>'
+    return f'<em>{em}</em>'
 
 def convert_markdown_to_html(text: str) -> str:
     """Convert markdown-style responses to proper HTML"""
     if not text:
         return text
-    
+
+    # The prompts demand HTML output, so the common case is a response that
+    # is already HTML with no markdown left in it - skip the line walk
+    if text.lstrip()[:1] == '<' and '**' not in text and '\n* ' not in text and '\n- ' not in text:
+        return text
+
     # First, handle headers that end with : (like "**Services:**")
     lines = text.split('\n')
     processed_lines = []
@@ -110,209 +372,21 @@ def convert_markdown_to_html(text: str) -> str:
             processed_lines.append(f'<p>• {content}</p>')
         else:
             # Regular paragraph - clean up any ** and * in the text
-            cleaned_line = line
-            # Handle **text** pattern properly
-            import re
-            cleaned_line = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', cleaned_line)
-            # Handle *text* pattern for emphasis
-            cleaned_line = re.sub(r'\*(.*?)\*', r'<em>\1</em>', cleaned_line)
-            processed_lines.append(f'<p>{cleaned_line}</p>')
-    
-    result = '\n'.join(processed_lines)
-    
-    # Clean up any double p tags
-    result = result.replace('<p><p>', '<p>')
-    result = result.replace('</p></p>', '</p>')
-    
-    # Clean up any p tags that contain h2 tags
-    result = result.replace('<p><h2>', '<h2>')
-    result = result.replace('</h2></p>', '</h2>')
-    
-    return result
-
-class ChatMessage(BaseModel):
-    message: str
-    website_url: Optional[str] = None
-    mode: Optional[str] = "basic"  # 'design', 'basic', or 'development'
-    session_id: Optional[str] = None  # For conversation memory
-    user_name: Optional[str] = None  # User's name from onboarding
-    user_email: Optional[str] = None  # User's email from onboarding
-    assistant_name: Optional[str] = None  # Assistant's preferred name
-
-class ChatResponse(BaseModel):
-    response: str
-    sources: Optional[List[str]] = None
-    memory_summary: Optional[str] = None  # Summary of conversation context
-
-def scrape_website(url: str) -> str:
-    """Scrape website content"""
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Get text content
-        text = soup.get_text()
-        
-        # Clean up whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        return text[:8000]  # Limit content length
-    except Exception as e:
-        return f"Error scraping website: {str(e)}"
-
-def scrape_multiple_pages(start_url: str, max_pages: int = 5) -> str:
-    """Crawl and scrape up to max_pages internal pages starting from start_url."""
-    visited = set()
-    to_visit = [start_url]
-    all_text = ""
-    domain = urlparse(start_url).netloc
-    while to_visit and len(visited) < max_pages:
-        url = to_visit.pop(0)
-        if url in visited:
-            continue
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            }
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            # Add delay to prevent rate limiting
-            time.sleep(1)
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            for script in soup(["script", "style"]):
-                script.decompose()
-            text = soup.get_text()
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            page_text = ' '.join(chunk for chunk in chunks if chunk)
-            all_text += page_text[:4000]  # Limit per page
-            visited.add(url)
-            # Find internal links
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                joined = urljoin(url, href)
-                parsed = urlparse(joined)
-                if parsed.netloc == domain and joined not in visited and joined not in to_visit:
-                    to_visit.append(joined)
-        except Exception:
-            continue
-    return all_text[:16000]  # Limit total content
+            cleaned_line = _INLINE_MD_RE.sub(_inline_md_repl, line)
+            # Don't re-wrap lines that are already block-level HTML
+            if cleaned_line.startswith(('<h2>', '<p>')):
+                processed_lines.append(cleaned_line)
+            else:
+                processed_lines.append(f'<p>{cleaned_line}</p>')
 
-def detect_mode(message: str) -> str:
-    design_keywords = ["design", "ui", "ux", "color", "layout", "branding", "typography", "visual", "logo", "font", "palette", "style"]
-    dev_keywords = ["code", "api", "react", "backend", "frontend", "deploy", "database", "server", "javascript", "python", "html", "css", "function", "bug", "error", "component"]
-    msg = message.lower()
-    if any(word in msg for word in design_keywords):
-        return "design"
-    if any(word in msg for word in dev_keywords):
-        return "development"
-    return "basic"
+    return '\n'.join(processed_lines)
 
-async def get_openai_response(system_prompt: str, user_message: str, memory_context: str = "") -> str:
-    """Get response from OpenAI API with memory context"""
-    try:
-        # Include memory context in system prompt if available
-        if memory_context:
-            enhanced_system_prompt = f"{system_prompt}\n\n{memory_context}"
-        else:
-            enhanced_system_prompt = system_prompt
-        
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": enhanced_system_prompt},
-                {"role": "user", "content": user_message}
-            ],
-            temperature=0.7,
-            max_tokens=800
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"Error getting AI response: {str(e)}"
+# System prompt templates
+# These used to be rebuilt as ~50-line f-strings inside the chat handler on
+# every request. They are assembled once at import; the handler only fills in
+# the small dynamic holes with .format().
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(chat_message: ChatMessage, website_url: str = Query(None, description="Website URL to analyze"), request: Request = None):
-    try:
-        user_message = chat_message.message
-        mode = detect_mode(chat_message.message)
-        
-        # Generate session ID if not provided
-        session_id = chat_message.session_id or "default_session"
-        
-        # Get memory context for this session
-        memory_context = create_memory_summary(session_id)
-        
-        # Prepare user context for AI
-        user_context = ""
-        if chat_message.user_name:
-            user_context += f"User's name: {chat_message.user_name}. "
-        if chat_message.user_email:
-            user_context += f"User's email: {chat_message.user_email}. "
-        if chat_message.assistant_name:
-            user_context += f"Assistant should call itself: {chat_message.assistant_name}. "
-        
-        # If no user context, provide default
-        if not user_context:
-            user_context = "No user information provided. "
-        
-        # Debug: Print user context
-        print(f"DEBUG: User context: '{user_context}'")
-        print(f"DEBUG: User name: {chat_message.user_name}")
-        print(f"DEBUG: User email: {chat_message.user_email}")
-        print(f"DEBUG: Assistant name: {chat_message.assistant_name}")
-        
-        # Enhance user message with context for better AI understanding
-        enhanced_user_message = f"{user_message}"
-        if chat_message.user_name:
-            enhanced_user_message += f" [IMPORTANT: The user's name is {chat_message.user_name}. When they ask about their name, tell them their name is {chat_message.user_name}.]"
-        if chat_message.user_email:
-            enhanced_user_message += f" [IMPORTANT: The user's email is {chat_message.user_email}. When they ask about their email, tell them their email is {chat_message.user_email}.]"
-        
-        # Use website_url from query parameter if provided, otherwise use message body
-        target_website = website_url if website_url else chat_message.website_url
-        
-        # If website URL is provided, analyze the website FIRST (PRIORITY)
-        if target_website:
-            # Allow any website for now (can be restricted later)
-            website_content = scrape_multiple_pages(target_website, max_pages=5)
-            if not website_content:
-                # Fallback to AI response when scraping fails
-                fallback_prompt = f"""🤖 You are a helpful AI assistant. The user is asking about a website ({target_website}) but I couldn't access its content. 
-
-👤 **USER INFORMATION - USE THIS INFORMATION:**
-{user_context}
-
-💡 **CRITICAL INSTRUCTIONS - YOU MUST FOLLOW THESE:**
-1. The user's name is: {chat_message.user_name or 'not provided'}
-2. The user's email is: {chat_message.user_email or 'not provided'}
-3. When the user asks "what is my name?" or "tell me my name", you MUST respond with their actual name: {chat_message.user_name or 'not provided'}
-4. When the user asks "what is my email?" or "tell me my email", you MUST respond with their actual email: {chat_message.user_email or 'not provided'}
-5. NEVER say you don't have access to this information - you DO have it above
-
-📋 **CRITICAL FORMATTING RULES - YOU MUST FOLLOW THESE EXACTLY:**
+FORMAT_RULES = """📋 **CRITICAL FORMATTING RULES - YOU MUST FOLLOW THESE EXACTLY:**
 • NEVER use markdown syntax like ** or * or bullet points
 • NEVER use bullet points (•) or asterisks (*) for lists
 • ALWAYS use proper HTML tags ONLY
@@ -322,100 +396,40 @@ async def chat_endpoint(chat_message: ChatMessage, website_url: str = Query(None
 • ALWAYS use <em> tags for emphasis on important words
 • ALWAYS use <strong> tags for key terms and concepts
 • ALWAYS add <br><br> between sections for proper spacing
-• NEVER skip HTML tags - they are REQUIRED
-
-💡 **INSTRUCTIONS:**
-Provide a helpful response based on your general knowledge. You MUST use HTML formatting as specified above. NEVER use markdown. If they're asking about the website specifically, explain that you can't access that website's content right now, but you'd be happy to help with general questions.
+• NEVER skip HTML tags - they are REQUIRED"""
 
-Example format:
-<h2><strong>Response Title</strong></h2>
-<p>Your response paragraph here.</p>
-<p>1. <strong>First point</strong> - explanation</p>
-<p>2. <strong>Second point</strong> - explanation</p>
-
-User's question: {chat_message.message}"""
-                
-                response = await get_openai_response(fallback_prompt, enhanced_user_message, memory_context)
-                
-                # Add to memory
-                add_to_memory(session_id, user_message, response)
-                
-                # Convert any remaining markdown to HTML
-                response = convert_markdown_to_html(response)
-                
-                # After generating the AI response, save to DB
-                ai_response = response
-                # Save to MySQL
-                try:
-                    conn = pymysql.connect(
-                        host=os.getenv("MYSQL_HOST", "localhost"),
-                        user=os.getenv("MYSQL_USER", "root"),
-                        password=os.getenv("MYSQL_PASSWORD", ""),
-                        database=os.getenv("MYSQL_DB", "chatbot_db")
-                    )
-                    cur = conn.cursor()
-                    ip_address = request.client.host if request and request.client else "unknown"
-                    cur.execute(
-                        "INSERT INTO user_messages (username, ip_address, email, user_message, ai_response) VALUES (%s, %s, %s, %s, %s)",
-                        (
-                            chat_message.user_name,
-                            ip_address,
-                            chat_message.user_email,
-                            chat_message.message,
-                            ai_response
-                        )
-                    )
-                    conn.commit()
-                    cur.close()
-                    conn.close()
-                except Exception as db_exc:
-                    print("DB insert error:", db_exc)
-                
-                return ChatResponse(
-                    response=response,
-                    memory_summary=memory_context
-                )
-            
-            # Check if the question is related to the website content
-            # If it's a general knowledge question, fall back to AI
-            general_questions = [
-                "india", "state", "city", "country", "capital", "population", "weather", "history",
-                "geography", "culture", "food", "language", "religion", "politics", "economy",
-                "science", "technology", "art", "music", "literature", "sports", "health", "education",
-                "date", "today", "time", "current", "now", "what day", "what time", "calendar",
-                "year", "month", "day", "hour", "minute", "second", "clock", "schedule"
-            ]
-            
-            is_general_question = any(keyword in user_message.lower() for keyword in general_questions)
-            
-            if is_general_question:
-                # For general questions, use AI knowledge instead of website content
-                if mode == "design":
-                    system_prompt = f"""🎨 You are an expert UI/UX and branding consultant. 
-
-👤 **USER INFORMATION - USE THIS INFORMATION:**
+USER_BLOCK = """👤 **USER INFORMATION - USE THIS INFORMATION:**
 {user_context}
 
 💡 **CRITICAL INSTRUCTIONS - YOU MUST FOLLOW THESE:**
-1. The user's name is: {chat_message.user_name or 'not provided'}
-2. The user's email is: {chat_message.user_email or 'not provided'}
-3. When the user asks "what is my name?" or "tell me my name", you MUST respond with their actual name: {chat_message.user_name or 'not provided'}
-4. When the user asks "what is my email?" or "tell me my email", you MUST respond with their actual email: {chat_message.user_email or 'not provided'}
-5. NEVER say you don't have access to this information - you DO have it above
+1. The user's name is: {user_name}
+2. The user's email is: {user_email}
+3. When the user asks "what is my name?" or "tell me my name", you MUST respond with their actual name: {user_name}
+4. When the user asks "what is my email?" or "tell me my email", you MUST respond with their actual email: {user_email}
+5. NEVER say you don't have access to this information - you DO have it above"""
+
+# Anonymous requests all share the same user block, so render it once at
+# import instead of re-formatting several hundred bytes per turn
+DEFAULT_USER_INFO_MESSAGE = {
+    "role": "system",
+    "content": USER_BLOCK.format(
+        user_context="No user information provided. ",
+        user_name="not provided",
+        user_email="not provided"
+    )
+}
 
-📋 **CRITICAL FORMATTING RULES - YOU MUST FOLLOW THESE EXACTLY:**
-• NEVER use markdown syntax like ** or * or bullet points
-• NEVER use bullet points (•) or asterisks (*) for lists
-• ALWAYS use proper HTML tags ONLY
-• ALWAYS start with <h2><strong>Main Heading</strong></h2>
-• ALWAYS wrap paragraphs in <p> tags with proper spacing
-• ALWAYS use numbered lists (1. 2. 3.) wrapped in <p> tags
-• ALWAYS use <em> tags for emphasis on important words
-• ALWAYS use <strong> tags for key terms and concepts
-• ALWAYS add <br><br> between sections for proper spacing
-• NEVER skip HTML tags - they are REQUIRED
+WEBSITE_BLOCK ="""🌐 **WEBSITE CONTENT TO ANALYZE:**
+{website_content}..."""
 
-💡 **INSTRUCTIONS:**
+ROLE_LINES = {
+    "design": "🎨 You are an expert UI/UX and branding consultant.",
+    "development": "💻 You are a senior web developer and technical expert.",
+    "basic": "🤖 You are a helpful AI assistant.",
+}
+
+MODE_INSTRUCTIONS = {
+    "design": """💡 **INSTRUCTIONS:**
 Answer design-related questions in detail. You MUST use HTML formatting as specified above. NEVER use markdown.
 
 Example format:
@@ -423,33 +437,8 @@ Example format:
 <p>Your first paragraph here.</p>
 <p>1. <strong>First design point</strong> - explanation</p>
 <p>2. <strong>Second design point</strong> - explanation</p>
-<p><em>Important design note</em> about the topic.</p>"""
-                elif mode == "development":
-                    system_prompt = f"""💻 You are a senior web developer and technical expert. 
-
-👤 **USER INFORMATION:**
-{user_context}
-
-💡 **CRITICAL INSTRUCTIONS - YOU MUST FOLLOW THESE:**
-1. The user's name is: {chat_message.user_name or 'not provided'}
-2. The user's email is: {chat_message.user_email or 'not provided'}
-3. When the user asks "what is my name?" or "tell me my name", you MUST respond with their actual name: {chat_message.user_name or 'not provided'}
-4. When the user asks "what is my email?" or "tell me my email", you MUST respond with their actual email: {chat_message.user_email or 'not provided'}
-5. NEVER say you don't have access to this information - you DO have it above
-
-📋 **CRITICAL FORMATTING RULES - YOU MUST FOLLOW THESE EXACTLY:**
-• NEVER use markdown syntax like ** or * or bullet points
-• NEVER use bullet points (•) or asterisks (*) for lists
-• ALWAYS use proper HTML tags ONLY
-• ALWAYS start with <h2><strong>Main Heading</strong></h2>
-• ALWAYS wrap paragraphs in <p> tags with proper spacing
-• ALWAYS use numbered lists (1. 2. 3.) wrapped in <p> tags
-• ALWAYS use <em> tags for emphasis on important words
-• ALWAYS use <strong> tags for key terms and concepts
-• ALWAYS add <br><br> between sections for proper spacing
-• NEVER skip HTML tags - they are REQUIRED
-
-💡 **INSTRUCTIONS:**
+<p><em>Important design note</em> about the topic.</p>""",
+    "development": """💡 **INSTRUCTIONS:**
 Answer development-related questions in detail. You MUST use HTML formatting as specified above. NEVER use markdown.
 
 Example format:
@@ -457,33 +446,8 @@ Example format:
 <p>Your first paragraph here.</p>
 <p>1. <strong>First development point</strong> - explanation</p>
 <p>2. <strong>Second development point</strong> - explanation</p>
-<p><em>Important development note</em> about the topic.</p>"""
-                else:
-                    system_prompt = f"""🤖 You are a helpful AI assistant. 
-
-👤 **USER INFORMATION:**
-{user_context}
-
-💡 **CRITICAL INSTRUCTIONS - YOU MUST FOLLOW THESE:**
-1. The user's name is: {chat_message.user_name or 'not provided'}
-2. The user's email is: {chat_message.user_email or 'not provided'}
-3. When the user asks "what is my name?" or "tell me my name", you MUST respond with their actual name: {chat_message.user_name or 'not provided'}
-4. When the user asks "what is my email?" or "tell me my email", you MUST respond with their actual email: {chat_message.user_email or 'not provided'}
-5. NEVER say you don't have access to this information - you DO have it above
-
-📋 **CRITICAL FORMATTING RULES - YOU MUST FOLLOW THESE EXACTLY:**
-• NEVER use markdown syntax like ** or * or bullet points
-• NEVER use bullet points (•) or asterisks (*) for lists
-• ALWAYS use proper HTML tags ONLY
-• ALWAYS start with <h2><strong>Main Heading</strong></h2>
-• ALWAYS wrap paragraphs in <p> tags with proper spacing
-• ALWAYS use numbered lists (1. 2. 3.) wrapped in <p> tags
-• ALWAYS use <em> tags for emphasis on important words
-• ALWAYS use <strong> tags for key terms and concepts
-• ALWAYS add <br><br> between sections for proper spacing
-• NEVER skip HTML tags - they are REQUIRED
-
-💡 **INSTRUCTIONS:**
+<p><em>Important development note</em> about the topic.</p>""",
+    "basic": """💡 **INSTRUCTIONS:**
 Answer questions clearly and concisely. You MUST use HTML formatting as specified above. NEVER use markdown.
 
 Example format:
@@ -491,69 +455,10 @@ Example format:
 <p>Your first paragraph here.</p>
 <p>1. <strong>First point</strong> - explanation</p>
 <p>2. <strong>Second point</strong> - explanation</p>
-<p><em>Important note</em> about the topic.</p>"""
-                
-                response = await get_openai_response(system_prompt, enhanced_user_message, memory_context)
-                
-                # Add to memory
-                add_to_memory(session_id, user_message, response)
-                
-                # Convert any remaining markdown to HTML
-                response = convert_markdown_to_html(response)
-                
-                # After generating the AI response, save to DB
-                ai_response = response
-                # Save to MySQL
-                try:
-                    conn = pymysql.connect(
-                        host=os.getenv("MYSQL_HOST", "localhost"),
-                        user=os.getenv("MYSQL_USER", "root"),
-                        password=os.getenv("MYSQL_PASSWORD", ""),
-                        database=os.getenv("MYSQL_DB", "chatbot_db")
-                    )
-                    cur = conn.cursor()
-                    ip_address = request.client.host if request and request.client else "unknown"
-                    cur.execute(
-                        "INSERT INTO user_messages (username, ip_address, email, user_message, ai_response) VALUES (%s, %s, %s, %s, %s)",
-                        (
-                            chat_message.user_name,
-                            ip_address,
-                            chat_message.user_email,
-                            chat_message.message,
-                            ai_response
-                        )
-                    )
-                    conn.commit()
-                    cur.close()
-                    conn.close()
-                except Exception as db_exc:
-                    print("DB insert error:", db_exc)
-                
-                return ChatResponse(
-                    response=response,
-                    memory_summary=memory_context
-                )
-            
-            # Choose system prompt based on mode for website-specific questions
-            if mode == "design":
-                system_prompt = f"""🎨 You are an expert UI/UX and branding consultant. 
-
-📋 **CRITICAL FORMATTING RULES - YOU MUST FOLLOW THESE EXACTLY:**
-• NEVER use markdown syntax like ** or * or bullet points
-• NEVER use bullet points (•) or asterisks (*) for lists
-• ALWAYS use proper HTML tags ONLY
-• ALWAYS start with <h2><strong>Main Heading</strong></h2>
-• ALWAYS wrap paragraphs in <p> tags with proper spacing
-• ALWAYS use numbered lists (1. 2. 3.) wrapped in <p> tags
-• ALWAYS use <em> tags for emphasis on important words
-• ALWAYS use <strong> tags for key terms and concepts
-• ALWAYS add <br><br> between sections for proper spacing
-• NEVER skip HTML tags - they are REQUIRED
-
-🌐 **WEBSITE CONTENT TO ANALYZE:**
-{website_content[:1000]}...
+<p><em>Important note</em> about the topic.</p>""",
+}
 
-💡 **INSTRUCTIONS:**
+WEBSITE_INSTRUCTIONS = """💡 **INSTRUCTIONS:**
 Answer the user's question based on the website content above. You MUST use HTML formatting as specified above. NEVER use markdown.
 
 Example format:
@@ -562,390 +467,566 @@ Example format:
 <p>1. <strong>First finding</strong> - explanation</p>
 <p>2. <strong>Second finding</strong> - explanation</p>
 <p><em>Important note</em> about the website.</p>"""
-            elif mode == "development":
-                system_prompt = f"""💻 You are a senior web developer and technical expert. 
 
-📋 **CRITICAL FORMATTING RULES - YOU MUST FOLLOW THESE EXACTLY:**
-• NEVER use markdown syntax like ** or * or bullet points
-• NEVER use bullet points (•) or asterisks (*) for lists
-• ALWAYS use proper HTML tags ONLY
-• ALWAYS start with <h2><strong>Main Heading</strong></h2>
-• ALWAYS wrap paragraphs in <p> tags with proper spacing
-• ALWAYS use numbered lists (1. 2. 3.) wrapped in <p> tags
-• ALWAYS use <em> tags for emphasis on important words
-• ALWAYS use <strong> tags for key terms and concepts
-• ALWAYS add <br><br> between sections for proper spacing
-• NEVER skip HTML tags - they are REQUIRED
+# The system prompts below are fully static (byte-identical across users and
+# requests) so the provider's prompt cache can reuse the prefix. Dynamic
+# content (user info, website content, memory) is sent as separate messages.
 
-🌐 **WEBSITE CONTENT TO ANALYZE:**
-{website_content[:1000]}...
+# FORMAT_RULES comes first in every prompt: it's the largest shared block, so
+# leading with it keeps the longest possible prefix byte-identical across all
+# modes and maximizes provider prefix-cache hits.
 
-💡 **INSTRUCTIONS:**
-Answer the user's question based on the website content above. You MUST use HTML formatting as specified above. NEVER use markdown.
+# General/AI-knowledge prompts: formatting rules + role + mode instructions
+SYSTEM_PROMPTS = {
+    mode: f"{FORMAT_RULES}\n\n{ROLE_LINES[mode]}\n\n{MODE_INSTRUCTIONS[mode]}"
+    for mode in ROLE_LINES
+}
 
-Example format:
-<h2><strong>Website Analysis Title</strong></h2>
-<p>Your analysis paragraph here.</p>
-<p>1. <strong>First finding</strong> - explanation</p>
-<p>2. <strong>Second finding</strong> - explanation</p>
-<p><em>Important note</em> about the website.</p>"""
-            else:
-                system_prompt = f"""🤖 You are a helpful AI assistant that analyzes website content. 
+# Website-analysis prompts: formatting rules + role + instructions
+WEBSITE_ROLE_LINES = dict(ROLE_LINES, basic="🤖 You are a helpful AI assistant that analyzes website content.")
+WEBSITE_SYSTEM_PROMPTS = {
+    mode: f"{FORMAT_RULES}\n\n{WEBSITE_ROLE_LINES[mode]}\n\n{WEBSITE_INSTRUCTIONS}"
+    for mode in WEBSITE_ROLE_LINES
+}
 
-📋 **CRITICAL FORMATTING RULES - YOU MUST FOLLOW THESE EXACTLY:**
-• NEVER use markdown syntax like ** or * or bullet points
-• NEVER use bullet points (•) or asterisks (*) for lists
-• NEVER use **text** or *text* - ONLY use <strong>text</strong> and <em>text</em>
-• NEVER use - or * for lists - ONLY use numbered lists (1. 2. 3.)
-• ALWAYS use proper HTML tags ONLY
-• ALWAYS start with <h2><strong>Main Heading</strong></h2>
-• ALWAYS wrap paragraphs in <p> tags with proper spacing
-• ALWAYS use numbered lists (1. 2. 3.) wrapped in <p> tags
-• ALWAYS use <em> tags for emphasis on important words
-• ALWAYS use <strong> tags for key terms and concepts
-• ALWAYS add <br><br> between sections for proper spacing
-• NEVER skip HTML tags - they are REQUIRED
+# Fallback prompt when the requested website couldn't be scraped
+FALLBACK_PROMPT = f"""{FORMAT_RULES}
 
-🌐 **WEBSITE CONTENT TO ANALYZE:**
-{website_content[:1000]}...
+🤖 You are a helpful AI assistant.
 
 💡 **INSTRUCTIONS:**
-Answer the user's question based on the website content above. You MUST use HTML formatting as specified above. NEVER use markdown.
+Provide a helpful response based on your general knowledge. You MUST use HTML formatting as specified above. NEVER use markdown. If they're asking about the website specifically, explain that you can't access that website's content right now, but you'd be happy to help with general questions.
 
 Example format:
-<h2><strong>Website Analysis Title</strong></h2>
-<p>Your analysis paragraph here.</p>
-<p>1. <strong>First finding</strong> - explanation</p>
-<p>2. <strong>Second finding</strong> - explanation</p>
-<p><em>Important note</em> about the website.</p>"""
-            
-            response = await get_openai_response(system_prompt, enhanced_user_message, memory_context)
-            
-            # Add to memory
-            add_to_memory(session_id, user_message, response)
-            
-            # Convert any remaining markdown to HTML
-            response = convert_markdown_to_html(response)
-            
-            # After generating the AI response, save to DB
-            ai_response = response
-            # Save to MySQL
-            try:
-                conn = pymysql.connect(
-                    host=os.getenv("MYSQL_HOST", "localhost"),
-                    user=os.getenv("MYSQL_USER", "root"),
-                    password=os.getenv("MYSQL_PASSWORD", ""),
-                    database=os.getenv("MYSQL_DB", "chatbot_db")
-                )
-                cur = conn.cursor()
-                ip_address = request.client.host if request and request.client else "unknown"
-                cur.execute(
-                    "INSERT INTO user_messages (username, ip_address, email, user_message, ai_response) VALUES (%s, %s, %s, %s, %s)",
-                    (
-                        chat_message.user_name,
-                        ip_address,
-                        chat_message.user_email,
-                        chat_message.message,
-                        ai_response
-                    )
-                )
-                conn.commit()
-                cur.close()
-                conn.close()
-            except Exception as db_exc:
-                print("DB insert error:", db_exc)
-            
-            return ChatResponse(
-                response=response,
-                memory_summary=memory_context
-            )
-        
-        # General conversation (this should happen before FAQ check)
-        if mode == "design":
-            system_prompt = f"""🎨 You are an expert UI/UX and branding consultant. 
+<h2><strong>Response Title</strong></h2>
+<p>Your response paragraph here.</p>
+<p>1. <strong>First point</strong> - explanation</p>
+<p>2. <strong>Second point</strong> - explanation</p>"""
 
-👤 **USER INFORMATION:**
-{user_context}
+class ChatMessage(BaseModel):
+    message: str
+    website_url: Optional[str] = None
+    mode: Optional[str] = "basic"  # 'design', 'basic', or 'development'
+    session_id: Optional[str] = None  # For conversation memory
+    user_name: Optional[str] = None  # User's name from onboarding
+    user_email: Optional[str] = None  # User's email from onboarding
+    assistant_name: Optional[str] = None  # Assistant's preferred name
 
-📋 **CRITICAL FORMATTING RULES - YOU MUST FOLLOW THESE EXACTLY:**
-• NEVER use markdown syntax like ** or * or bullet points
-• NEVER use bullet points (•) or asterisks (*) for lists
-• ALWAYS use proper HTML tags ONLY
-• ALWAYS start with <h2><strong>Main Heading</strong></h2>
-• ALWAYS wrap paragraphs in <p> tags with proper spacing
-• ALWAYS use numbered lists (1. 2. 3.) wrapped in <p> tags
-• ALWAYS use <em> tags for emphasis on important words
-• ALWAYS use <strong> tags for key terms and concepts
-• ALWAYS add <br><br> between sections for proper spacing
-• NEVER skip HTML tags - they are REQUIRED
+class ChatResponse(BaseModel):
+    response: str
+    sources: Optional[List[str]] = None
+    memory_summary: Optional[str] = None  # Summary of conversation context
 
-💡 **INSTRUCTIONS:**
-Answer design-related questions in detail. You MUST use HTML formatting as specified above. NEVER use markdown.
+# Parse only what we actually use: the body for text, anchors for links.
+# Skipping <head> keeps the C-backed lxml parse even cheaper.
+_BODY_STRAINER = SoupStrainer("body")
+_BODY_LINK_STRAINER = SoupStrainer(["body", "a"])
 
-Example format:
-<h2><strong>Design Answer Title</strong></h2>
-<p>Your first paragraph here.</p>
-<p>1. <strong>First design point</strong> - explanation</p>
-<p>2. <strong>Second design point</strong> - explanation</p>
-<p><em>Important design note</em> about the topic.</p>"""
-        elif mode == "development":
-            system_prompt = f"""💻 You are a senior web developer and technical expert. 
+# Collapses all runs of whitespace in a single C-level pass
+_WS_RE = re.compile(r'\s+')
 
-👤 **USER INFORMATION:**
-{user_context}
+# Hrefs we can reject without paying for urljoin/urlsplit
+_SKIP_PREFIXES = ('#', 'mailto:', 'javascript:', 'tel:', 'data:')
 
-📋 **CRITICAL FORMATTING RULES - YOU MUST FOLLOW THESE EXACTLY:**
-• NEVER use markdown syntax like ** or * or bullet points
-• NEVER use bullet points (•) or asterisks (*) for lists
-• ALWAYS use proper HTML tags ONLY
-• ALWAYS start with <h2><strong>Main Heading</strong></h2>
-• ALWAYS wrap paragraphs in <p> tags with proper spacing
-• ALWAYS use numbered lists (1. 2. 3.) wrapped in <p> tags
-• ALWAYS use <em> tags for emphasis on important words
-• ALWAYS use <strong> tags for key terms and concepts
-• ALWAYS add <br><br> between sections for proper spacing
-• NEVER skip HTML tags - they are REQUIRED
+async def scrape_website(url: str) -> str:
+    """Scrape website content"""
+    try:
+        html = await _fetch_html(url)
+        if not html:
+            return ""
 
-💡 **INSTRUCTIONS:**
-Answer development-related questions in detail. You MUST use HTML formatting as specified above. NEVER use markdown.
+        soup = BeautifulSoup(html, 'lxml', parse_only=_BODY_STRAINER)
+        
+        # Remove script and style elements
+        for script in soup(["script", "style"]):
+            script.decompose()
+        
+        # Get text content with whitespace collapsed
+        text = _WS_RE.sub(' ', soup.get_text(separator=' ')).strip()
 
-Example format:
-<h2><strong>Development Answer Title</strong></h2>
-<p>Your first paragraph here.</p>
-<p>1. <strong>First development point</strong> - explanation</p>
-<p>2. <strong>Second development point</strong> - explanation</p>
-<p><em>Important development note</em> about the topic.</p>"""
-        else:
-            system_prompt = f"""🤖 You are a helpful AI assistant. 
+        return text[:8000]  # Limit content length
+    except Exception as e:
+        return f"Error scraping website: {str(e)}"
 
-👤 **USER INFORMATION:**
-{user_context}
+# Cap concurrent fetches per crawl to stay polite to the target host
+_CRAWL_SEMAPHORE = asyncio.Semaphore(5)
 
-📋 **CRITICAL FORMATTING RULES - YOU MUST FOLLOW THESE EXACTLY:**
-• NEVER use markdown syntax like ** or * or bullet points
-• NEVER use bullet points (•) or asterisks (*) for lists
-• ALWAYS use HTML tags ONLY
-• ALWAYS start with <h2><strong>Main Heading</strong></h2>
-• ALWAYS wrap paragraphs in <p> tags with proper spacing
-• ALWAYS use numbered lists (1. 2. 3.) wrapped in <p> tags
-• ALWAYS use <em> tags for emphasis on important words
-• ALWAYS use <strong> tags for key terms and concepts
-• ALWAYS add <br><br> between sections for proper spacing
-• NEVER skip HTML tags - they are REQUIRED
+# Stop pulling a page once we have more than enough to fill the text limits;
+# without a cap a huge (or hostile) page costs unbounded bandwidth and parse time
+_MAX_PAGE_BYTES = 512 * 1024
 
-💡 **INSTRUCTIONS:**
-Answer questions clearly and concisely. You MUST use HTML formatting as specified above. NEVER use markdown.
+async def _fetch_html(url: str) -> bytes:
+    """Fetch a page, returning at most _MAX_PAGE_BYTES of HTML (empty if not HTML)"""
+    async with HTTP_CLIENT.stream("GET", url, timeout=10) as response:
+        response.raise_for_status()
+        if "html" not in response.headers.get("content-type", ""):
+            return b""
+        buf = bytearray()
+        async for chunk in response.aiter_bytes():
+            buf.extend(chunk)
+            if len(buf) > _MAX_PAGE_BYTES:
+                break
+        return bytes(buf)
+
+# Crawl results are reused for 10 minutes; users usually ask several
+# questions about the same site in a row. Per-key locks stop concurrent
+# requests from all re-crawling a cold key.
+_SCRAPE_CACHE = cachetools.TTLCache(maxsize=256, ttl=600)
+_SCRAPE_LOCKS = defaultdict(asyncio.Lock)
+
+async def _fetch_page(url: str) -> bytes:
+    """Fetch a single page, bounded by the crawl semaphore"""
+    async with _CRAWL_SEMAPHORE:
+        return await _fetch_html(url)
+
+async def scrape_multiple_pages(start_url: str, max_pages: int = 5) -> str:
+    """Crawl and scrape up to max_pages internal pages starting from start_url."""
+    key = (start_url, max_pages)
+    cached = _SCRAPE_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    async with _SCRAPE_LOCKS[key]:
+        # Another request may have populated the cache while we waited
+        cached = _SCRAPE_CACHE.get(key)
+        if cached is not None:
+            return cached
+        result = await _crawl_pages(start_url, max_pages)
+        # Store the already-truncated text, not raw HTML
+        _SCRAPE_CACHE[key] = result
+        return result
+
+async def _crawl_pages(start_url: str, max_pages: int) -> str:
+    """Run the actual crawl; scrape_multiple_pages handles caching."""
+    visited = set()
+    to_visit = [start_url]
+    all_text = ""
+    domain = urlsplit(start_url).netloc
+    while to_visit and len(visited) < max_pages:
+        # Fetch the current frontier concurrently instead of one page at a time
+        batch = to_visit[:max_pages - len(visited)]
+        to_visit = to_visit[len(batch):]
+        results = await asyncio.gather(*[_fetch_page(url) for url in batch], return_exceptions=True)
+        for url, html in zip(batch, results):
+            visited.add(url)
+            if isinstance(html, Exception) or not html:
+                continue
+            soup = BeautifulSoup(html, 'lxml', parse_only=_BODY_LINK_STRAINER)
+            for script in soup(["script", "style"]):
+                script.decompose()
+            page_text = _WS_RE.sub(' ', soup.get_text(separator=' ')).strip()
+            all_text += page_text[:4000]  # Limit per page
+            # Find internal links
+            for link in soup.find_all('a', href=True):
+                href = link['href']
+                if href.startswith(_SKIP_PREFIXES):
+                    continue
+                # Absolute URLs pointing off-domain can be rejected cheaply
+                if href.startswith('http') and domain not in href:
+                    continue
+                joined = urljoin(url, href)
+                if urlsplit(joined).netloc == domain and joined not in visited and joined not in to_visit:
+                    to_visit.append(joined)
+    return all_text[:16000]  # Limit total content
 
-Example format:
-<h2><strong>Your Answer Title</strong></h2>
-<p>Your first paragraph here.</p>
-<p>1. <strong>First point</strong> - explanation</p>
-<p>2. <strong>Second point</strong> - explanation</p>
-<p><em>Important note</em> about the topic.</p>"""
-        
-        response = await get_openai_response(system_prompt, enhanced_user_message, memory_context)
-        
-        # Add to memory
-        add_to_memory(session_id, user_message, response)
-        
-        # Convert any remaining markdown to HTML
-        response = convert_markdown_to_html(response)
-        
-        # After generating the AI response, save to DB
-        ai_response = response
-        # Save to MySQL
-        try:
-            conn = pymysql.connect(
-                host=os.getenv("MYSQL_HOST", "localhost"),
-                user=os.getenv("MYSQL_USER", "root"),
-                password=os.getenv("MYSQL_PASSWORD", ""),
-                database=os.getenv("MYSQL_DB", "chatbot_db")
-            )
-            cur = conn.cursor()
-            ip_address = request.client.host if request and request.client else "unknown"
-            cur.execute(
-                "INSERT INTO user_messages (username, ip_address, email, user_message, ai_response) VALUES (%s, %s, %s, %s, %s)",
-                (
-                    chat_message.user_name,
-                    ip_address,
-                    chat_message.user_email,
-                    chat_message.message,
-                    ai_response
-                )
+# Keyword sets built once; each detection below is a single Aho-Corasick
+# DFA pass over the message, O(len(message)) regardless of list size
+_DESIGN_KW = frozenset({"design", "ui", "ux", "color", "layout", "branding", "typography", "visual", "logo", "font", "palette", "style"})
+_DEV_KW = frozenset({"code", "api", "react", "backend", "frontend", "deploy", "database", "server", "javascript", "python", "html", "css", "function", "bug", "error", "component"})
+
+GENERAL_KW = frozenset({
+    "india", "state", "city", "country", "capital", "population", "weather", "history",
+    "geography", "culture", "food", "language", "religion", "politics", "economy",
+    "science", "technology", "art", "music", "literature", "sports", "health", "education",
+    "date", "today", "time", "current", "now", "calendar",
+    "year", "month", "day", "hour", "minute", "second", "clock", "schedule"
+})
+GENERAL_PHRASES = ("what day", "what time")
+
+def _build_automaton(words) -> ahocorasick.Automaton:
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
+_DESIGN_AC = _build_automaton(_DESIGN_KW)
+_DEV_AC = _build_automaton(_DEV_KW)
+_GENERAL_AC = _build_automaton(GENERAL_KW | set(GENERAL_PHRASES))
+
+def _matches_keywords(automaton: ahocorasick.Automaton, message_lc: str) -> bool:
+    """True if any keyword occurs in message_lc at word boundaries"""
+    for end, word in automaton.iter(message_lc):
+        start = end - len(word) + 1
+        if start > 0 and message_lc[start - 1].isalpha():
+            continue
+        if end + 1 < len(message_lc) and message_lc[end + 1].isalpha():
+            continue
+        return True
+    return False
+
+def detect_mode(message_lc: str) -> str:
+    """Detect the chat mode from an already-lowercased message"""
+    if _matches_keywords(_DESIGN_AC, message_lc):
+        return "design"
+    if _matches_keywords(_DEV_AC, message_lc):
+        return "development"
+    return "basic"
+
+# Identical (mode, message) pairs produce near-identical completions with the
+# fixed system prompts, so the final HTML response is cached for an hour.
+# Only anonymous turns with no session memory are cached — once a name, email
+# or memory context is in play the answer is personalized and must not be
+# shared across users.
+response_cache = cachetools.TTLCache(maxsize=10_000, ttl=3600)
+
+def _response_cache_key(mode: str, user_message: str) -> str:
+    return hashlib.sha256((mode + "\x00" + user_message.strip().lower()).encode()).hexdigest()
+
+# Semantic cache: paraphrases of an already-answered question ("what is seo?"
+# vs "explain seo") reuse the cached answer when their embeddings are close
+# enough, trading one cheap embedding call for a full completion. Entries are
+# kept per mode since the same question gets different answers per persona.
+_EMBED_MODEL = "text-embedding-3-small"
+_SEMANTIC_THRESHOLD = 0.92
+_SEMANTIC_MAX_ENTRIES = 10_000
+
+_semantic_embeddings = {}  # mode -> (N, D) float32 array, rows L2-normalized
+_semantic_answers = defaultdict(list)  # mode -> answers parallel to the rows
+
+async def _embed_message(text: str):
+    """Return the L2-normalized embedding of a message, or None on failure"""
+    try:
+        resp = await OPENAI.embeddings.create(model=_EMBED_MODEL, input=text)
+    except Exception:
+        logger.exception("Embedding error")
+        return None
+    vec = np.asarray(resp.data[0].embedding, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+def _semantic_lookup(mode: str, query_vec):
+    """Closest cached answer by cosine similarity, or None below threshold"""
+    matrix = _semantic_embeddings.get(mode)
+    if matrix is None:
+        return None
+    sims = matrix @ query_vec  # one GEMV; rows and query are unit-length
+    best = int(sims.argmax())
+    if sims[best] >= _SEMANTIC_THRESHOLD:
+        return _semantic_answers[mode][best]
+    return None
+
+def _semantic_store(mode: str, query_vec, answer: str):
+    answers = _semantic_answers[mode]
+    if len(answers) >= _SEMANTIC_MAX_ENTRIES:
+        return
+    matrix = _semantic_embeddings.get(mode)
+    row = query_vec[np.newaxis, :]
+    _semantic_embeddings[mode] = row if matrix is None else np.vstack((matrix, row))
+    answers.append(answer)
+
+async def get_openai_response(messages: list, memory_context: str = "") -> str:
+    """Get response from OpenAI API with memory context.
+
+    The first message should be a static system prompt so the provider's
+    prompt cache can reuse its prefix; dynamic context goes in follow-up
+    messages.
+    """
+    # Append memory context as its own message so it doesn't break the
+    # cacheable static prefix
+    if memory_context:
+        messages = messages + [{"role": "system", "content": memory_context}]
+
+    response = await OPENAI.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=messages,
+        temperature=0.7,
+        max_tokens=800
+    )
+    return response.choices[0].message.content
+
+# The user-info block and the reminder suffix only change when the profile
+# fields do - within a session that's essentially never - so the rendered
+# strings are cached keyed by those fields. Keeping the rendered prompt text
+# byte-identical across turns also maximizes provider-side prompt-cache hits.
+_user_info_cache = cachetools.TTLCache(maxsize=_MAX_SESSIONS, ttl=_SESSION_TTL_SECONDS)
+
+def _build_user_info(user_name, user_email, assistant_name):
+    """Render (user_context, user_info_message, reminder suffix) for a profile"""
+    fields = (user_name, user_email, assistant_name)
+    cached = _user_info_cache.get(fields)
+    if cached is not None:
+        return cached
+
+    # Prepare user context for AI
+    user_context = ""
+    if user_name:
+        user_context += f"User's name: {user_name}. "
+    if user_email:
+        user_context += f"User's email: {user_email}. "
+    if assistant_name:
+        user_context += f"Assistant should call itself: {assistant_name}. "
+
+    # If no user context, provide default
+    if not user_context:
+        user_context = "No user information provided. "
+
+    # Dynamic user info goes in its own message so the static system
+    # prompt stays byte-identical across requests (prompt-cache friendly);
+    # anonymous requests reuse the prerendered default block
+    if user_context == "No user information provided. ":
+        user_info_message = DEFAULT_USER_INFO_MESSAGE
+    else:
+        user_info_message = {
+            "role": "system",
+            "content": USER_BLOCK.format(
+                user_context=user_context,
+                user_name=user_name or 'not provided',
+                user_email=user_email or 'not provided'
             )
-            conn.commit()
-            cur.close()
-            conn.close()
-        except Exception as db_exc:
-            print("DB insert error:", db_exc)
-        
-        return ChatResponse(
-            response=response,
-            memory_summary=memory_context
-        )
-    
-        # Only check FAQ as a last resort if no other response was generated
-        for faq_question, faq_answer in faq_data.items():
-            if any(word in user_message.lower() for word in faq_question.lower().split()):
-                # Add FAQ response to memory
-                add_to_memory(session_id, user_message, faq_answer)
-                
-                # Convert any remaining markdown to HTML
-                faq_answer = convert_markdown_to_html(faq_answer)
-                
-                # After generating the AI response, save to DB
-                ai_response = faq_answer
-                # Save to MySQL
-                try:
-                    conn = pymysql.connect(
-                        host=os.getenv("MYSQL_HOST", "localhost"),
-                        user=os.getenv("MYSQL_USER", "root"),
-                        password=os.getenv("MYSQL_PASSWORD", ""),
-                        database=os.getenv("MYSQL_DB", "chatbot_db")
-                    )
-                    cur = conn.cursor()
-                    ip_address = request.client.host if request and request.client else "unknown"
-                    cur.execute(
-                        "INSERT INTO user_messages (username, ip_address, email, user_message, ai_response) VALUES (%s, %s, %s, %s, %s)",
-                        (
-                            chat_message.user_name,
-                            ip_address,
-                            chat_message.user_email,
-                            chat_message.message,
-                            ai_response
-                        )
-                    )
-                    conn.commit()
-                    cur.close()
-                    conn.close()
-                except Exception as db_exc:
-                    print("DB insert error:", db_exc)
-                
+        }
+
+    # Reminder suffix appended to every user message for this profile
+    suffix = ""
+    if user_name:
+        suffix += f" [IMPORTANT: The user's name is {user_name}. When they ask about their name, tell them their name is {user_name}.]"
+    if user_email:
+        suffix += f" [IMPORTANT: The user's email is {user_email}. When they ask about their email, tell them their email is {user_email}.]"
+
+    result = (user_context, user_info_message, suffix)
+    _user_info_cache[fields] = result
+    return result
+
+def _build_user_messages(chat_message):
+    """Render the user-context string, user-info block and enhanced message"""
+    user_context, user_info_message, suffix = _build_user_info(
+        chat_message.user_name, chat_message.user_email, chat_message.assistant_name
+    )
+
+    # Lazy %-formatting: these are no-ops unless DEBUG logging is enabled
+    logger.debug("User context: %r", user_context)
+    logger.debug("User name: %s", chat_message.user_name)
+    logger.debug("User email: %s", chat_message.user_email)
+    logger.debug("Assistant name: %s", chat_message.assistant_name)
+
+    # Enhance user message with context for better AI understanding
+    enhanced_user_message = chat_message.message + suffix
+
+    return user_context, user_info_message, enhanced_user_message
+
+async def _build_prompt_messages(mode: str, user_message_lc: str, target_website, user_info_message, enhanced_user_message):
+    """Build the prompt messages for whichever path applies.
+
+    Website analysis takes priority; generation, memory, markdown conversion
+    and DB logging stay with the callers.
+    """
+    if target_website:
+        # Allow any website for now (can be restricted later)
+        website_content = await scrape_multiple_pages(target_website, max_pages=5)
+
+        # Check if the question is related to the website content
+        # If it's a general knowledge question, fall back to AI
+        is_general_question = _matches_keywords(_GENERAL_AC, user_message_lc)
+
+        if not website_content:
+            # Fallback to AI response when scraping fails
+            return [
+                {"role": "system", "content": FALLBACK_PROMPT},
+                user_info_message,
+                {"role": "system", "content": f"Note: the user is asking about a website ({target_website}) but its content couldn't be accessed."},
+                {"role": "user", "content": enhanced_user_message}
+            ]
+        if is_general_question:
+            # For general questions, use AI knowledge instead of website content
+            return [
+                {"role": "system", "content": SYSTEM_PROMPTS[mode]},
+                user_info_message,
+                {"role": "user", "content": enhanced_user_message}
+            ]
+        # Website-specific question: answer from the scraped content
+        return [
+            {"role": "system", "content": WEBSITE_SYSTEM_PROMPTS[mode]},
+            {"role": "system", "content": WEBSITE_BLOCK.format(website_content=website_content[:1000])},
+            {"role": "user", "content": enhanced_user_message}
+        ]
+
+    # General conversation
+    return [
+        {"role": "system", "content": SYSTEM_PROMPTS[mode]},
+        user_info_message,
+        {"role": "user", "content": enhanced_user_message}
+    ]
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat_endpoint(chat_message: ChatMessage, website_url: str = Query(None, description="Website URL to analyze"), request: Request = None):
+    try:
+        user_message = chat_message.message
+        user_message_lc = user_message.lower()
+        mode = detect_mode(user_message_lc)
+
+        # Generate session ID if not provided
+        session_id = chat_message.session_id or "default_session"
+
+        # Get memory context for this session
+        memory_context = create_memory_summary(session_id)
+
+        user_context, user_info_message, enhanced_user_message = _build_user_messages(chat_message)
+
+        # Use website_url from query parameter if provided, otherwise use message body
+        target_website = website_url if website_url else chat_message.website_url
+
+        # Canned FAQ answers skip the OpenAI call entirely
+        if not target_website:
+            faq_answer = match_faq(user_message_lc)
+            if faq_answer is not None:
+                await _persist_chat(request, chat_message, faq_answer)
                 return ChatResponse(
                     response=faq_answer,
                     memory_summary=memory_context
                 )
-        
-        # If we get here, provide a general AI response
-        system_prompt = f"""🤖 You are a helpful AI assistant. 
 
-👤 **USER INFORMATION - USE THIS INFORMATION:**
-{user_context}
+        # Repeated identical questions can short-circuit the OpenAI call, but
+        # only when nothing personalizes the answer (no website, no session
+        # memory, no user details)
+        cache_key = None
+        query_vec = None
+        if not target_website and not memory_context and user_context == "No user information provided. ":
+            cache_key = _response_cache_key(mode, user_message)
+            cached = response_cache.get(cache_key)
+            if cached is None:
+                # Exact miss: try a semantic match against past questions
+                query_vec = await _embed_message(user_message)
+                if query_vec is not None:
+                    cached = _semantic_lookup(mode, query_vec)
+            if cached is not None:
+                await _persist_chat(request, chat_message, cached)
+                return ChatResponse(
+                    response=cached,
+                    memory_summary=memory_context
+                )
 
-💡 **CRITICAL INSTRUCTIONS - YOU MUST FOLLOW THESE:**
-1. The user's name is: {chat_message.user_name or 'not provided'}
-2. The user's email is: {chat_message.user_email or 'not provided'}
-3. When the user asks "what is my name?" or "tell me my name", you MUST respond with their actual name: {chat_message.user_name or 'not provided'}
-4. When the user asks "what is my email?" or "tell me my email", you MUST respond with their actual email: {chat_message.user_email or 'not provided'}
-5. NEVER say you don't have access to this information - you DO have it above
+        messages = await _build_prompt_messages(mode, user_message_lc, target_website, user_info_message, enhanced_user_message)
 
-📋 **CRITICAL FORMATTING RULES - YOU MUST FOLLOW THESE EXACTLY:**
-• NEVER use markdown syntax like ** or * or bullet points
-• NEVER use bullet points (•) or asterisks (*) for lists
-• ALWAYS use proper HTML tags ONLY
-• ALWAYS start with <h2><strong>Main Heading</strong></h2>
-• ALWAYS wrap paragraphs in <p> tags with proper spacing
-• ALWAYS use numbered lists (1. 2. 3.) wrapped in <p> tags
-• ALWAYS use <em> tags for emphasis on important words
-• ALWAYS use <strong> tags for key terms and concepts
-• ALWAYS add <br><br> between sections for proper spacing
-• NEVER skip HTML tags - they are REQUIRED
-
-💡 **INSTRUCTIONS:**
-Answer questions clearly and concisely. You MUST use HTML formatting as specified above. NEVER use markdown.
+        response = await get_openai_response(messages, memory_context)
 
-Example format:
-<h2><strong>Your Answer Title</strong></h2>
-<p>Your first paragraph here.</p>
-<p>1. <strong>First point</strong> - explanation</p>
-<p>2. <strong>Second point</strong> - explanation</p>
-<p><em>Important note</em> about the topic.</p>"""
-
-        response = await get_openai_response(system_prompt, enhanced_user_message, memory_context)
-        
         # Add to memory
         add_to_memory(session_id, user_message, response)
-        
+
         # Convert any remaining markdown to HTML
         response = convert_markdown_to_html(response)
-        
+
+        if cache_key is not None:
+            response_cache[cache_key] = response
+            if query_vec is not None:
+                _semantic_store(mode, query_vec, response)
+
         # After generating the AI response, save to DB
-        ai_response = response
-        # Save to MySQL
-        try:
-            conn = pymysql.connect(
-                host=os.getenv("MYSQL_HOST", "localhost"),
-                user=os.getenv("MYSQL_USER", "root"),
-                password=os.getenv("MYSQL_PASSWORD", ""),
-                database=os.getenv("MYSQL_DB", "chatbot_db")
-            )
-            cur = conn.cursor()
-            ip_address = request.client.host if request and request.client else "unknown"
-            cur.execute(
-                "INSERT INTO user_messages (username, ip_address, email, user_message, ai_response) VALUES (%s, %s, %s, %s, %s)",
-                (
-                    chat_message.user_name,
-                    ip_address,
-                    chat_message.user_email,
-                    chat_message.message,
-                    ai_response
-                )
-            )
-            conn.commit()
-            cur.close()
-            conn.close()
-        except Exception as db_exc:
-            print("DB insert error:", db_exc)
-        
+        await _persist_chat(request, chat_message, response)
+
         return ChatResponse(
             response=response,
             memory_summary=memory_context
         )
-        
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
 
+@app.post("/chat/stream")
+async def chat_stream_endpoint(chat_message: ChatMessage, website_url: str = Query(None, description="Website URL to analyze"), request: Request = None):
+    """Stream the AI response as Server-Sent Events.
+
+    Same prompt construction as /chat, but tokens are forwarded as they
+    arrive so the client sees the first words immediately instead of waiting
+    for the full completion. Memory, markdown conversion and DB logging run
+    once after the stream finishes.
+    """
+    user_message = chat_message.message
+    user_message_lc = user_message.lower()
+    mode = detect_mode(user_message_lc)
+    session_id = chat_message.session_id or "default_session"
+    memory_context = create_memory_summary(session_id)
+    user_context, user_info_message, enhanced_user_message = _build_user_messages(chat_message)
+    target_website = website_url if website_url else chat_message.website_url
+
+    messages = await _build_prompt_messages(mode, user_message_lc, target_website, user_info_message, enhanced_user_message)
+    if memory_context:
+        messages = messages + [{"role": "system", "content": memory_context}]
+
+    async def event_stream():
+        parts = []
+        try:
+            stream = await OPENAI.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=messages,
+                temperature=0.7,
+                max_tokens=800,
+                stream=True
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield f"data: {json.dumps({'token': delta})}\n\n"
+            yield "data: [DONE]\n\n"
+        except Exception:
+            logger.exception("Stream error")
+            yield f"data: {json.dumps({'error': 'Error processing chat'})}\n\n"
+        finally:
+            response = "".join(parts)
+            if response:
+                add_to_memory(session_id, user_message, response)
+                await _persist_chat(request, chat_message, convert_markdown_to_html(response))
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @app.get("/health")
 async def health_check():
     return {
         "status": "healthy", 
         "message": "Chatbot API is running",
-        "website_url": os.getenv("WEBSITE_URL", "https://www.anonivate.com/")
+        "website_url": WEBSITE_URL
     }
 
 @app.get("/config")
 async def get_config():
     return {
-        "website_url": os.getenv("WEBSITE_URL", "https://www.anonivate.com/"),
+        "website_url": WEBSITE_URL,
         "has_website_content": True
     }
 
 @app.get("/memory/{session_id}")
 async def get_memory(session_id: str):
     """Get conversation memory for a specific session"""
-    if session_id not in conversation_memory:
+    dq = conversation_memory.get(session_id)
+    if not dq:
         return {"session_id": session_id, "messages": [], "count": 0}
-    
+
+    messages = list(dq)
     return {
         "session_id": session_id,
-        "messages": conversation_memory[session_id],
-        "count": len(conversation_memory[session_id])
+        "messages": messages,
+        "count": len(messages)
     }
 
 @app.delete("/memory/{session_id}")
 async def clear_memory(session_id: str):
     """Clear conversation memory for a specific session"""
-    if session_id in conversation_memory:
-        del conversation_memory[session_id]
+    if conversation_memory.pop(session_id, None) is not None:
+        memory_summaries.pop(session_id, None)
+        _rendered_summaries.pop(session_id, None)
         return {"message": f"Memory cleared for session {session_id}"}
     return {"message": f"No memory found for session {session_id}"}
 
 @app.get("/memory")
-async def list_sessions():
-    """List all active conversation sessions"""
+async def list_sessions(limit: int = Query(50, ge=1, le=500), offset: int = Query(0, ge=0)):
+    """List active conversation sessions (paginated)"""
+    # Slice lazily instead of materializing every key; response size stays
+    # bounded no matter how many sessions are live
     return {
-        "active_sessions": list(conversation_memory.keys()),
-        "total_sessions": len(conversation_memory)
+        "active_sessions": list(islice(conversation_memory.keys(), offset, offset + limit)),
+        "total_sessions": len(conversation_memory),
+        "limit": limit,
+        "offset": offset
     }
 
 # if __name__ == "__main__":
@@ -0,0 +1,13 @@
+-- Schema for the chat logging database used by backend/main.py
+CREATE TABLE IF NOT EXISTS user_messages (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    username VARCHAR(255),
+    ip_address VARCHAR(45),
+    email VARCHAR(255),
+    user_message TEXT,
+    ai_response TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Analytics queries filter by user and origin; keep them off a full scan
+CREATE INDEX idx_user_ip ON user_messages (username, ip_address);